@@ -16,6 +16,10 @@ class Grid:
         self.width = max(len(row) for row in grid)
         self.height = len(grid)
 
+        # Cost and adjacency of every cell by index, built on first use
+        self._costs: list[int] | None = None
+        self._adjacency: tuple[list[int], list[int], list[str]] | None = None
+
     def get_node(self, pos: tuple[int, int]) -> Node:
         """Get node by position
 
@@ -79,5 +83,49 @@ class Grid:
 
         return possible_actions
 
+    def get_costs(self) -> list[int]:
+        """Get the weight of every cell at once
+
+        Cells are indexed as row * width + col. The result is computed once
+        and reused on later calls.
+
+        Returns:
+            list[int]: Weight of each cell
+        """
+        if self._costs is None:
+            self._costs = [node.cost for row in self.grid for node in row]
+
+        return self._costs
+
+    def get_adjacency(self) -> tuple[list[int], list[int], list[str]]:
+        """Determine the neighbours of every cell in compressed (CSR) form
+
+        Cells are indexed as row * width + col. The neighbours of cell i are
+        targets[offsets[i]:offsets[i + 1]], reached by the matching actions.
+        Flat lists of ints keep the garbage collector out of the way, unlike
+        one container per cell.
+
+        Returns:
+            tuple[list[int], list[int], list[str]]: Offsets, targets, actions
+        """
+        if self._adjacency is None:
+            width = self.width
+            offsets = [0]
+            targets = []
+            actions = []
+
+            # Reuse get_neighbours, so every search sees the same moves
+            for row in range(self.height):
+                for col in range(width):
+                    neighbours = self.get_neighbours((row, col))
+                    for action, (r, c) in neighbours.items():
+                        targets.append(r * width + c)
+                        actions.append(action)
+                    offsets.append(len(targets))
+
+            self._adjacency = (offsets, targets, actions)
+
+        return self._adjacency
+
     def __repr__(self) -> str:
         return f"Grid([[...], ...], {self.start}, {self.end})"
@@ -1,5 +1,6 @@
+from heapq import heappush, heappop
+
 from ..models.grid import Grid
-from ..models.frontier import PriorityQueueFrontier
 from ..models.solution import NoSolution, Solution
 from ..models.node import Node
 
@@ -14,55 +15,103 @@ class UniformCostSearch:
         Returns:
             Solution: Solution found
         """
-        # Initialize a node with the initial position
-        node = Node("", grid.start, 0)
-
-        # Initialize the explored dictionary to be empty
-        explored = {} 
-        
-        # Add the node to the explored dictionary
-        explored[node.state] = node.cost
-        
-
-        # Initialize the frontier with the initial node
-        # In this example, the frontier is a priority queue
-        frontier = PriorityQueueFrontier()
-        frontier.add(node)
-
+        # Encode each position (row, col) as the integer row * width + col
+        width = grid.width
+        start = grid.start[0] * width + grid.start[1]
+
+        # Keep the expansion order, used to animate the explored cells
+        # A state is explored once it is popped from the frontier
+        expanded = []
+
+        # Keep, for each state, the cheapest known cost to reach it
+        # and the parent state and action of that path
+        size = width * grid.height
+        best_cost = [float("inf")] * size
+        parents = [-1] * size
+        parent_actions = [None] * size
+        best_cost[start] = 0
+
+        # Initialize the frontier with the initial state
+        # In this example, the frontier is a heap of (cost, state) pairs
+        frontier = [(0, start)]
+
+        # Bind the lookups used in the loop to local names
+        offsets, targets, actions = grid.get_adjacency()
+        costs = grid.get_costs()
+        end = grid.end[0] * width + grid.end[1]
 
         while True:
 
             #  Fail if the frontier is empty
-            if frontier.is_empty():
-                return NoSolution(explored)
+            if not frontier:
+                return NoSolution(
+                    [divmod(state, width) for state in expanded])
 
-            # Remove a node from the frontier
-            current_node = frontier.pop()
+            # Remove a state from the frontier
+            cost, state = heappop(frontier)
 
-            if current_node.state == grid.end:
-                return Solution(current_node, explored)
+            # Skip stale entries, the state was pushed again with a lower cost
+            # Costs are never negative, so explored states are never pushed again
+            if cost > best_cost[state]:
+                continue
+
+            # Mark the state as explored
+            expanded.append(state)
+
+            if state == end:
+                return Solution(
+                    UniformCostSearch.build_node(
+                        state, parents, parent_actions, best_cost, width),
+                    [divmod(state, width) for state in expanded])
 
             # UCS
-            successors = grid.get_neighbours(current_node.state)
+            # Iterate over the successors of the state in the adjacency lists
+            for k in range(offsets[state], offsets[state + 1]):
 
-            # Iterate over the dictionary `successors` and unpack each key/value pair
-            for key, value in successors.items():
-                
-                #get cost
-                new_cost = current_node.cost + grid.get_cost(value)
                 # Get the successor
-                new_state = value
+                new_state = targets[k]
+                #get cost
+                new_cost = cost + costs[new_state]
 
-                # Check if the successor is not reached
-                if new_state not in explored or new_cost < explored[new_state]:
+                # Check if the path to the successor is cheaper
+                if new_cost < best_cost[new_state]:
 
-                    # Initialize the son node
-                    new_node = Node("", state=new_state,
-                                    cost=new_cost,
-                                    parent=current_node, action=key)
+                    # Remember the cheapest cost and how it was reached
+                    best_cost[new_state] = new_cost
+                    parents[new_state] = state
+                    parent_actions[new_state] = actions[k]
+
+                    # Add the new state to the frontier
+                    heappush(frontier, (new_cost, new_state))
+
+    @staticmethod
+    def build_node(
+        state: int,
+        parents: list[int],
+        parent_actions: list[str | None],
+        best_cost: list[float],
+        width: int
+    ) -> Node:
+        """Build the chain of nodes that leads to an encoded state
+
+        Args:
+            state (int): Encoded final state
+            parents (list[int]): Parent state of each state, -1 if none
+            parent_actions (list[str | None]): Action that reached each state
+            best_cost (list[float]): Path cost of each state, inf if unreached
+            width (int): Width of the grid used to encode the states
+
+        Returns:
+            Node: Node of the final state, linked to its ancestors
+        """
+        path = []
+        while state != -1:
+            path.append(state)
+            state = parents[state]
 
-                    # Mark the successor as reached
-                    explored[new_state] = new_cost
+        node = None
+        for state in reversed(path):
+            node = Node("", divmod(state, width), best_cost[state],
+                        parent=node, action=parent_actions[state])
 
-                    # Add the new node to the frontier
-                    frontier.add(new_node)
\ No newline at end of file
+        return node
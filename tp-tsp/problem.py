@@ -37,9 +37,10 @@ Formulacion de estado completo para el Problema del Viajante:
 """
 
 from __future__ import annotations
-from typing import TypeVar
-from random import shuffle
+from typing import Collection, TypeVar
+from random import Random, shuffle
 from networkx import Graph
+import numpy as np
 
 State = TypeVar('State')
 Action = TypeVar('Action')
@@ -60,22 +61,40 @@ class OptProblem:
         """Determina el estado resultado de aplicar una accion a un estado."""
         raise NotImplementedError
 
+    def apply(self, state: State, action: Action) -> None:
+        """Aplica una accion a un estado, modificandolo en el lugar.
+
+        Evita crear un estado nuevo en cada paso cuando el estado anterior
+        ya no se necesita.
+        """
+        raise NotImplementedError
+
     def obj_val(self, state: State) -> float:
         """Determina el valor objetivo de un estado."""
         raise NotImplementedError
 
-    def max_action(self, state: State) -> tuple[Action, float]:
+    def max_action(self, state: State, *, value: float | None = None) -> tuple[Action, float]:
         """Determina la accion que genera el sucesor con mayor valor objetivo para un estado dado.
 
         La idea es que este metodo este optimizado y sea mas eficiente que generar cada
         estado sucesor por separado y calcular su valor objetivo con self.obj_val().
+        Si se conoce el valor objetivo del estado, se pasa en value para no recalcularlo.
         """
         raise NotImplementedError
 
-    def random_reset(self) -> State:
+    def upper_bound(self) -> float:
+        """Retorna una cota superior del valor objetivo.
+
+        Si un estado la alcanza, es optimo y la busqueda puede detenerse.
+        Por defecto no se conoce ninguna cota.
+        """
+        return float("inf")
+
+    def random_reset(self, rng: Random | None = None) -> State:
         """Retorna un estado generado al azar. 
         
         Este método será necesario para implementar el reinicion aleatorio.
+        Si se pasa rng, se usa ese generador en lugar del modulo random.
         """
         raise NotImplementedError
 
@@ -83,7 +102,7 @@ class OptProblem:
 class TSP(OptProblem):
     """Subclase que representa al Problema del Viajante (TSP).
 
-    Un estado es una lista de enteros: list[int].
+    Un estado es un arreglo de enteros: np.ndarray de tipo int32.
     Una accion es un par de enteros: tuple[int,int].
     """
 
@@ -98,15 +117,47 @@ class TSP(OptProblem):
         """
         super().__init__()
         self.G = G
-        self.init = list(range(0, G.number_of_nodes()))
-        self.init.append(0)
-
-    def actions(self, state: list[int]) -> list[tuple[int, int]]:
+        n = G.number_of_nodes()
+        self.init = np.arange(n + 1, dtype=np.int32) % n
+
+        # Matriz de distancias, indexada por ciudad (de 0 a n-1)
+        # Usa el tipo de los pesos (enteros en TSPLIB) para que los valores
+        # objetivo no cambien de tipo
+        edges = list(G.edges(data="weight"))
+        weight_type = np.asarray([weight for _, _, weight in edges]).dtype
+        self.dist = np.zeros((n, n), dtype=weight_type)
+        for u, v, weight in edges:
+            self.dist[u - 1, v - 1] = weight
+            self.dist[v - 1, u - 1] = weight
+
+        # Mascara de las acciones invalidas, las que no estan en self.actions()
+        self.invalid = np.ones((n, n), dtype=bool)
+        for i, j in self.actions(self.init):
+            self.invalid[i, j] = False
+
+        # Cota superior del valor objetivo: cada ciudad tiene dos aristas en el
+        # tour, que no pueden ser mas cortas que sus dos aristas mas cortas
+        self._upper_bound = float("inf")
+        if n >= 3:
+            nearest = self.dist.astype(float)
+            np.fill_diagonal(nearest, np.inf)
+            total = np.partition(nearest, 1, axis=1)[:, :2].sum() / 2
+            if np.issubdtype(weight_type, np.integer):
+                total = np.ceil(total)  # la longitud de un tour es entera
+            self._upper_bound = -total.astype(weight_type).item()
+
+        # Buffers reutilizados por max_action, para no reservar memoria en cada paso
+        # gain es de punto flotante para poder marcar acciones con -inf
+        self._gain = np.empty((n, n))
+        self._rows = np.empty((n, n), dtype=weight_type)
+        self._dists = np.empty((n, n), dtype=weight_type)
+
+    def actions(self, state: np.ndarray) -> list[tuple[int, int]]:
         """Determina la lista de acciones que se pueden aplicar a un estado.
 
         Argumentos:
         ==========
-        state: list[int]
+        state: np.ndarray
             un estado
 
         Retorno:
@@ -121,32 +172,44 @@ class TSP(OptProblem):
                     act.append((i, j))
         return act
 
-    def result(self, state: list[int], action: tuple[int, int]) -> list[int]:
+    def result(self, state: np.ndarray, action: tuple[int, int]) -> np.ndarray:
         """Determina el estado que resulta de aplicar una accion a un estado.
 
         Argumentos:
         ==========
-        state: list[int]
+        state: np.ndarray
             un estado
         action: tuple[int, int]
             una accion de self.acciones(state)
 
         Retorno:
         =======
-        succ: list[int]
+        succ: np.ndarray
             estado sucesor
         """
-        succ = list(state)  # copy of the current state
-        i, j = action
-        succ[i + 1: j+1] = state[i + 1: j+1][::-1]  # reverse
+        succ = state.copy()  # copy of the current state
+        self.apply(succ, action)
         return succ
 
-    def obj_val(self, state: list[int]) -> float:
+    def apply(self, state: np.ndarray, action: tuple[int, int]) -> None:
+        """Aplica una accion a un estado, modificandolo en el lugar.
+
+        Argumentos:
+        ==========
+        state: np.ndarray
+            un estado, que pasa a ser el estado sucesor
+        action: tuple[int, int]
+            una accion de self.acciones(state)
+        """
+        i, j = action
+        state[i + 1: j+1] = state[i + 1: j+1][::-1]  # reverse
+
+    def obj_val(self, state: np.ndarray) -> float:
         """Determina el valor objetivo de un estado.
 
         Argumentos:
         ==========
-        state: list[int]
+        state: np.ndarray
             un estado
 
         Retorno:
@@ -154,23 +217,25 @@ class TSP(OptProblem):
         value: float
             valor objetivo
         """
-        value = 0
-        for i in range(0, self.G.number_of_nodes()):
-            u = state[i]+1  # origen
-            v = state[i+1]+1  # destino
-            value -= self.G.get_edge_data(u, v)['weight']
-        return value
-
-    def max_action(self, state: list[int], tabu_list: list[tuple[int, int]] = []) -> tuple[tuple[int, int], float]:
+        return -self.dist[state[:-1], state[1:]].sum().item()
+
+    def max_action(self, state: np.ndarray, tabu_list: Collection[tuple[int, int]] = (),
+                   *, value: float | None = None) -> tuple[tuple[int, int], float]:
         """Determina la accion que genera el sucesor con mayor valor objetivo para un estado dado.
         
-        Se encuentra optimizada y por razones de eficiencia no se generan los sucesores y 
-        tampoco se llama a self.obj_val().
+        Se encuentra optimizada y por razones de eficiencia no se generan los sucesores.
+        La ganancia de todas las acciones se calcula de una vez con numpy:
+        la accion (i, j) cambia las aristas (v_i, v_i+1) y (v_j, v_j+1)
+        por (v_i, v_j) y (v_i+1, v_j+1).
 
         Argumentos:
         ==========
-        state: list[int]
+        state: np.ndarray
             un estado
+        tabu_list: Collection[tuple[int, int]]
+            acciones prohibidas
+        value: float | None
+            valor objetivo de state, si ya se conoce; sino se calcula
 
         Retorno:
         =======
@@ -179,37 +244,65 @@ class TSP(OptProblem):
         max_val: float
             valor objetivo del sucesor que resulta de aplicar min_act
         """
-        value = self.obj_val(state)
-        max_act = None
-        max_val = float("-inf")
-        for a in self.actions(state):
-            if a in tabu_list:
-                continue  # Ignorar acciones que estén en la lista tabú
-            i, j = a
-            v1 = state[i]+1  # origen de i
-            v2 = state[i+1]+1  # destino de i
-            v3 = state[j]+1  # origen de j
-            v4 = state[j+1]+1  # destino de j
-            distl1l2 = self.G.get_edge_data(v1, v2)['weight']
-            distl3l4 = self.G.get_edge_data(v3, v4)['weight']
-            distl1l3 = self.G.get_edge_data(v1, v3)['weight']
-            distl2l4 = self.G.get_edge_data(v2, v4)['weight']
-            succ_value =  value + distl1l2 + distl3l4 - distl1l3 - distl2l4
-            if succ_value > max_val:
-                max_act = a
-                max_val = succ_value
-        return max_act, max_val
-
-    def random_reset(self) -> list[int]:
+        if value is None:
+            value = self.obj_val(state)
+        dist = self.dist
+        gain, rows, dists = self._gain, self._rows, self._dists
+        orig = state[:-1]  # origen de cada arista
+        dest = state[1:]  # destino de cada arista
+
+        # gain[i, j] = dist[v_i][v_i+1] + dist[v_j][v_j+1]
+        #            - dist[v_i][v_j] - dist[v_i+1][v_j+1]
+        # Todas las operaciones escriben sobre los buffers
+        edges = dist[orig, dest]
+        np.add(edges[:, None], edges[None, :], out=gain)
+        for ends in (orig, dest):
+            np.take(dist, ends, axis=0, out=rows)
+            np.take(rows, ends, axis=1, out=dists)
+            gain -= dists
+
+        # Descartar acciones invalidas y acciones que estén en la lista tabú
+        np.copyto(gain, -np.inf, where=self.invalid)
+        for i, j in tabu_list:
+            gain[i, j] = -np.inf
+
+        # argmax devuelve la primera accion maxima, en el mismo orden que self.actions()
+        i, j = np.unravel_index(gain.argmax(), gain.shape)
+        if gain[i, j] == -np.inf:
+            return None, float("-inf")
+        # La ganancia se devuelve con el tipo de las distancias
+        return (int(i), int(j)), value + gain[i, j].astype(dist.dtype).item()
+
+    def upper_bound(self) -> float:
+        """Retorna una cota superior del valor objetivo.
+
+        Cada ciudad aporta dos aristas al tour, y cada arista se cuenta en sus
+        dos extremos: ningun tour es mas corto que la mitad de la suma, sobre
+        todas las ciudades, de sus dos aristas mas cortas. Se calcula una sola
+        vez al construir la instancia.
+
+        Retorno:
+        =======
+        bound: float
+            opuesto de esa cota inferior de la longitud del tour
+        """
+        return self._upper_bound
+
+    def random_reset(self, rng: Random | None = None) -> np.ndarray:
         """Devuelve un estado del TSP con un tour aleatorio.
+
+        Argumentos:
+        ==========
+        rng: Random | None
+            generador de numeros aleatorios; si es None se usa el modulo random
         
         Retorno:
         =======
-        state: list[int]
+        state: np.ndarray
             un estado
         """
         state = [i for i in range(1, self.G.number_of_nodes())]
-        shuffle(state)  # mezclar la lista
+        (rng.shuffle if rng is not None else shuffle)(state)  # mezclar la lista
         state.append(0)  # agregar a 0 como inicio del tour
         state.insert(0, 0)  # agregar a 0 como fin del tour
-        return state
+        return np.array(state, dtype=np.int32)
@@ -16,8 +16,17 @@ No viene implementado, se debe completar.
 
 
 from __future__ import annotations
+from collections import deque
+from multiprocessing import Pool, cpu_count
+from operator import itemgetter
+from random import Random, SystemRandom
 from time import time
-from problem import OptProblem
+from problem import OptProblem, State
+
+# Tiempo aproximado (en segundos) que cuesta levantar un Pool de procesos.
+# Con el metodo spawn (Windows, macOS) cada proceso vuelve a importar los
+# modulos del programa, lo que ronda un segundo.
+POOL_STARTUP_TIME = 1.0
 
 
 class LocalSearch:
@@ -36,6 +45,60 @@ class LocalSearch:
         self.value = problem.obj_val(problem.init)
 
 
+def _hill_climb(task: tuple[OptProblem, int | None]) -> tuple[State, float, int]:
+    """Ejecuta una ascension de colinas hasta alcanzar un optimo local.
+
+    Es el ciclo comun de HillClimbing y de cada reinicio de HillClimbingReset.
+    Es una funcion de modulo para que multiprocessing pueda serializarla.
+
+    Argumentos:
+    ==========
+    task: tuple[OptProblem, int | None]
+        el problema y la semilla del reinicio aleatorio,
+        con semilla None se arranca del estado inicial
+
+    Retorno:
+    =======
+    actual: State
+        optimo local alcanzado
+    value: float
+        valor objetivo del optimo local
+    niters: int
+        numero de iteraciones realizadas
+    """
+    problem, seed = task
+
+    # Enlazamos los metodos del problema a nombres locales
+    max_action = problem.max_action
+    apply = problem.apply
+    upper_bound = problem.upper_bound()
+
+    # Reinicio aleatorio o copia del estado inicial, que se modifica en el lugar
+    if seed is None:
+        actual = problem.init.copy()
+    else:
+        actual = problem.random_reset(Random(seed))
+
+    value = problem.obj_val(actual)
+    niters = 0
+
+    # Si alcanzamos la cota superior, ningun sucesor puede mejorar
+    while value < upper_bound:
+        # Buscamos la acción que genera el sucesor con mayor valor objetivo
+        act, succ_val = max_action(actual, value=value)
+
+        # Si estamos en un máximo local, terminamos
+        if succ_val <= value:
+            break
+
+        # Sino, nos movemos al sucesor
+        apply(actual, act)
+        value = succ_val
+        niters += 1
+
+    return actual, value, niters
+
+
 class HillClimbing(LocalSearch):
     """Clase que representa un algoritmo de ascension de colinas.
 
@@ -54,29 +117,12 @@ class HillClimbing(LocalSearch):
         # Inicio del reloj
         start = time()
 
-        # Arrancamos del estado inicial
-        actual = problem.init
-        value = problem.obj_val(problem.init)
-
-        while True:
-
-            # Buscamos la acción que genera el sucesor con mayor valor objetivo
-            act, succ_val = problem.max_action(actual)
-
-            # Retornar si estamos en un maximo local:
-            # el valor objetivo del sucesor es menor o igual al del estado actual
-            if succ_val <= value:
+        # Ascendemos desde el estado inicial hasta un maximo local
+        self.tour, self.value, niters = _hill_climb((problem, None))
+        self.niters += niters
 
-                self.tour = actual
-                self.value = value
-                end = time()
-                self.time = end-start
-                return
-
-            # Sino, nos movemos al sucesor
-            actual = problem.result(actual, act)
-            value = succ_val
-            self.niters += 1
+        end = time()
+        self.time = end-start
 
 
 class HillClimbingReset(LocalSearch):
@@ -100,6 +146,11 @@ class HillClimbingReset(LocalSearch):
     def solve(self, problem: OptProblem):
         """Resuelve un problema de optimización con reinicio aleatorio.
 
+        Los reinicios son independientes entre si, por lo que pueden repartirse
+        entre varios procesos. El primero se ejecuta en secuencia y su duracion
+        estima el costo del resto: solo se usa un Pool si el tiempo ahorrado
+        supera lo que cuesta levantarlo.
+
         Argumentos:
         ==========
         problem: OptProblem
@@ -108,42 +159,37 @@ class HillClimbingReset(LocalSearch):
         # Inicio del reloj
         start = time()
 
-        # Variables para almacenar la mejor solución global
-        best_tour = None
-        best_value = float('-inf')
-
-        for restart in range(self.max_restarts):
-            # Reinicio aleatorio o estado inicial
-            if restart == 0:
-                actual = problem.init
-            else:
-                actual = problem.random_reset()
-
-            value = problem.obj_val(actual)
-
-            while True:
-                # Buscamos la acción que genera el sucesor con mayor valor objetivo
-                act, succ_val = problem.max_action(actual)
-
-                # Si estamos en un máximo local, terminamos esta iteración
-                if succ_val <= value:
-                    break
-
-                # Sino, nos movemos al sucesor
-                actual = problem.result(actual, act)
-                value = succ_val
-                self.niters += 1
-
-            # Actualizamos la mejor solución global si encontramos una mejor
-            if value > best_value:
-                best_tour = actual
-                best_value = value
+        # El primer reinicio arranca del estado inicial (semilla None),
+        # el resto de un estado aleatorio con su propia semilla
+        rng = SystemRandom()
+        tasks = [(problem, None if restart == 0 else rng.getrandbits(32))
+                 for restart in range(self.max_restarts)]
+
+        # Ejecutamos el primer reinicio y medimos cuanto tarda
+        climb_start = time()
+        results = [_hill_climb(task) for task in tasks[:1]]
+        estimate = (time() - climb_start) * (len(tasks) - 1)
+
+        # El resto en paralelo solo si lo ahorrado compensa levantar el Pool
+        processes = min(cpu_count(), len(tasks) - 1)
+        if processes >= 2 and estimate * (1 - 1 / processes) > POOL_STARTUP_TIME:
+            with Pool(processes) as pool:
+                results += pool.map(_hill_climb, tasks[1:])
+        else:
+            results += [_hill_climb(task) for task in tasks[1:]]
+
+        # Nos quedamos con la mejor solución global
+        # Sin reinicios no hay solución, como en la version secuencial original
+        best_tour, best_value, _ = max(results, key=itemgetter(1),
+                                       default=(None, float('-inf'), 0))
 
         # Guardamos la mejor solución global
         self.tour = best_tour
         self.value = best_value
+        self.niters += sum(niters for _, _, niters in results)
         self.time = time() - start
 
+
 class Tabu(LocalSearch):
     """Algoritmo de busqueda tabu."""
 
@@ -158,8 +204,11 @@ class Tabu(LocalSearch):
             Número de iteraciones sin mejora para activar el reinicio.
         """
         super().__init__()
-        self.tabu_list = []  # Lista tabú implementada como lista simple
         self.tabu_limit = tabu_limit # Límite de tamaño de la lista tabú
+        # Lista tabú en orden de llegada. Se recorta a tabu_limit en cada iteración
+        # y luego puede recibir una acción más, por eso admite tabu_limit + 1
+        self.tabu_list = deque(maxlen=tabu_limit + 1)
+        self.tabu_set = set()  # Mismas acciones que tabu_list, para consultas en O(1)
         self.no_improve_limit = no_improve_limit  # Límite para reinicios
         self.no_improve_count = 0  # Contador de iteraciones sin mejora
 
@@ -174,40 +223,46 @@ class Tabu(LocalSearch):
         # Inicio del reloj
         start = time()
 
-        # Arrancamos del estado inicial
-        actual = problem.init
+        # Arrancamos de una copia del estado inicial, que se modifica en el lugar
+        actual = problem.init.copy()
         value = problem.obj_val(problem.init)
-        best_tour = actual
+        best_tour = actual.copy()
         best_value = value
 
+        # Enlazamos los metodos del problema a nombres locales
+        max_action = problem.max_action
+        apply = problem.apply
+
         # Ciclo principal de búsqueda
         while self.no_improve_count < self.no_improve_limit:
             # Buscamos la acción que genera el sucesor con mayor valor objetivo
-            act, succ_val = problem.max_action(actual, tabu_list=self.tabu_list)
-            
+            act, succ_val = max_action(actual, tabu_list=self.tabu_set, value=value)
+
             # Aplicar criterio de aspiración: Ignorar tabú si mejora la mejor solución
-            if act in self.tabu_list and succ_val > best_value:
+            if act in self.tabu_set and succ_val > best_value:
                 self.tabu_list.remove(act)  # Remover de la lista tabú si cumple el criterio de aspiración
-            
+                self.tabu_set.discard(act)
+
             # Si se supera el límite de la lista tabú, eliminar el elemento más antiguo
             if self.tabu_limit < len(self.tabu_list):
-                self.tabu_list.pop(0)
-            
+                self.tabu_set.discard(self.tabu_list.popleft())
+
             # Si la nueva solución es mejor, actualiza el estado
             if value < succ_val:
                 self.tabu_list.append(act)  # Agregar acción a la lista tabú
-                actual = problem.result(actual, act)
+                self.tabu_set.add(act)
+                apply(actual, act)
                 value = succ_val
                 self.niters += 1
                 # Actualizamos la mejor solución global si encontramos una mejor
                 if value > best_value:
                     best_value = value
-                    best_tour = actual
+                    best_tour = actual.copy()
                     self.no_improve_count = 0
                 continue
 
             # Sino, nos movemos al sucesor
-            actual = problem.result(actual, act)
+            apply(actual, act)
             value = succ_val
             self.no_improve_count += 1
             self.niters += 1